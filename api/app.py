@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-import json
+import logging
 import os
+import string
+import socket
+import struct
+import threading
 import time
 from datetime import datetime, timezone
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, Field
+import orjson
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
 
 from intelligence.correlation import build_incident_key
 from intelligence.enrichment import enrich_event
-from intelligence.ioc_cache import HotIndicatorCache
+from intelligence.ioc_cache import HotIndicatorCache, KnownIndicatorFilter
 from intelligence.ioc_matching import now_iso, score_sighting
 from intelligence.ioc_normalization import (
     extract_event_indicators,
@@ -30,30 +35,73 @@ from observability.metrics import (
 )
 from response.alert_manager import build_alert, send_email_alert
 from storage.database import (
+    close_thread_connections,
+    decompress_json,
     fetch_alerts,
     fetch_dashboard_stats,
-    fetch_indicator_matches,
+    fetch_indicator_keys,
+    fetch_indicator_matches_many,
     fetch_sightings,
     get_connection,
+    get_read_connection,
     init_db,
-    insert_sighting,
-    insert_alert,
-    insert_detection,
+    search_events,
+    transaction,
+    insert_sightings_many,
+    insert_alerts_many,
+    insert_detections_many,
     insert_event,
+    insert_events_many,
     upsert_indicator,
     update_event_metadata,
     update_incident,
 )
 
-app = FastAPI(title="Monmail Threat Intel")
+app = FastAPI(title="Monmail Threat Intel", default_response_class=ORJSONResponse)
 
 DB_PATH = os.getenv("MONMAIL_DB_PATH", "./data/monmail.db")
 RULES_PATH = os.getenv("MONMAIL_RULES_PATH", "./config/detection_rules.yaml")
 DATA_DIR = os.getenv("MONMAIL_DATA_DIR", "./data")
+INGEST_SOCKET = os.getenv("MONMAIL_INGEST_SOCKET")
 HOT_INDICATOR_CACHE = HotIndicatorCache()
+KNOWN_INDICATORS = KnownIndicatorFilter()
+
+logger = logging.getLogger("monmail.api")
+
+
+def _dumps(obj: object) -> str:
+    return orjson.dumps(obj).decode()
+
+
+_loads = orjson.loads
+
+
+def _rows_to_response(rows: list) -> Response:
+    if not rows:
+        return Response(content=b"[]", media_type="application/json")
+    columns = rows[0].keys()
+    payload = orjson.dumps([dict(zip(columns, row)) for row in rows])
+    return Response(content=payload, media_type="application/json")
+
+_RULES_CACHE: dict = {"mtime": None, "rules": []}
+
+
+def get_rules() -> list[dict]:
+    try:
+        mtime = os.stat(RULES_PATH).st_mtime
+    except OSError:
+        if _RULES_CACHE["mtime"] is None:
+            raise
+        return _RULES_CACHE["rules"]
+    if mtime != _RULES_CACHE["mtime"]:
+        _RULES_CACHE["rules"] = load_rules(RULES_PATH)
+        _RULES_CACHE["mtime"] = mtime
+    return _RULES_CACHE["rules"]
 
 
 class SMTPInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     mail_from: str | None = None
     rcpt_to: str | None = None
     helo: str | None = None
@@ -61,12 +109,16 @@ class SMTPInfo(BaseModel):
 
 
 class EmailInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     subject: str | None = None
     message_id: str | None = None
     client_ip: str | None = None
 
 
 class DNSInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     query: str | None = None
     qtype: str | None = None
     rcode: str | None = None
@@ -74,27 +126,39 @@ class DNSInfo(BaseModel):
 
 
 class HostInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     name: str | None = None
 
 
 class SensorInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     id: str | None = None
 
 
 class TenantInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     id: str | None = None
 
 
 class AssetInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     id: str | None = None
     criticality: str | None = None
 
 
 class UserInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     name: str | None = None
 
 
 class AttachmentInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     hash: str | None = None
 
 
@@ -115,7 +179,7 @@ class EventIn(BaseModel):
     url: str | None = None
     client_ip: str | None = None
     resolved_ip: str | None = None
-    metadata: dict = Field(default_factory=dict)
+    metadata: dict | None = None
     raw: str
 
 
@@ -141,6 +205,69 @@ class IndicatorIn(BaseModel):
 def startup() -> None:
     conn = get_connection(DB_PATH)
     init_db(conn)
+    KNOWN_INDICATORS.load(fetch_indicator_keys(conn))
+    if INGEST_SOCKET:
+        _start_ingest_socket(INGEST_SOCKET)
+
+
+_FRAME_PREFIX = struct.Struct(">I")
+
+
+def _start_ingest_socket(path: str) -> None:
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    threading.Thread(target=_serve_ingest_socket, args=(server,), daemon=True).start()
+
+
+def _serve_ingest_socket(server: socket.socket) -> None:
+    while True:
+        client, _ = server.accept()
+        threading.Thread(target=_handle_ingest_client, args=(client,), daemon=True).start()
+
+
+def _recv_exact(client: socket.socket, size: int) -> bytes | None:
+    chunks = b""
+    while len(chunks) < size:
+        chunk = client.recv(size - len(chunks))
+        if not chunk:
+            return None
+        chunks += chunk
+    return chunks
+
+
+def _handle_ingest_client(client: socket.socket) -> None:
+    try:
+        with client:
+            while True:
+                header = _recv_exact(client, _FRAME_PREFIX.size)
+                if header is None:
+                    return
+                payload = _recv_exact(client, _FRAME_PREFIX.unpack(header)[0])
+                if payload is None:
+                    return
+                try:
+                    _ingest_frame(payload)
+                except Exception:
+                    logger.exception("Dropped malformed ingest frame")
+    finally:
+        # This thread dies with the client; release its pooled connections
+        # or every collector reconnect leaks a file descriptor.
+        close_thread_connections()
+
+
+def _ingest_frame(payload: bytes) -> None:
+    event = EventIn(**_loads(payload))
+    conn = get_connection(DB_PATH)
+    event_payload, metadata, normalized_fields, indicators = _prepare_event(event)
+    with transaction(conn):
+        _, _, pending_emails = _store_event(
+            conn, event_payload, metadata, get_rules(), normalized_fields, indicators
+        )
+    for subject, body in pending_emails:
+        send_email_alert(subject, body)
 
 
 @app.get("/health")
@@ -155,193 +282,311 @@ def metrics() -> HTMLResponse:
 
 
 @app.get("/alerts")
-def list_alerts(limit: int = 50) -> list[dict]:
-    conn = get_connection(DB_PATH)
+def list_alerts(limit: int = 50) -> Response:
+    conn = get_read_connection(DB_PATH)
     rows = fetch_alerts(conn, limit=limit)
-    return [dict(row) for row in rows]
+    return _rows_to_response(rows)
+
+
+@app.get("/events/search")
+def list_matching_events(q: str, limit: int = 50) -> Response:
+    conn = get_read_connection(DB_PATH)
+    rows = search_events(conn, q, limit=limit)
+    events = [dict(zip(row.keys(), row)) for row in rows]
+    for event in events:
+        event["metadata"] = decompress_json(event["metadata"])
+    return Response(content=orjson.dumps(events), media_type="application/json")
 
 
 @app.get("/sightings")
-def list_sightings(limit: int = 50) -> list[dict]:
-    conn = get_connection(DB_PATH)
+def list_sightings(limit: int = 50) -> Response:
+    conn = get_read_connection(DB_PATH)
     rows = fetch_sightings(conn, limit=limit)
-    return [dict(row) for row in rows]
+    return _rows_to_response(rows)
+
+
+_STATS_CACHE: dict = {"expires": 0.0, "stats": None}
+_STATS_TTL = 1.0
+
+
+def get_dashboard_stats() -> dict:
+    now = time.monotonic()
+    if _STATS_CACHE["stats"] is None or now >= _STATS_CACHE["expires"]:
+        _STATS_CACHE["stats"] = fetch_dashboard_stats(get_read_connection(DB_PATH))
+        _STATS_CACHE["expires"] = now + _STATS_TTL
+    return _STATS_CACHE["stats"]
 
 
 @app.get("/dashboard")
 def dashboard() -> dict:
-    conn = get_connection(DB_PATH)
-    return fetch_dashboard_stats(conn)
+    return get_dashboard_stats()
 
 
-@app.get("/", response_class=HTMLResponse)
-def dashboard_ui() -> str:
-    stats = fetch_dashboard_stats(get_connection(DB_PATH))
-    return f"""
+_DASH_TPL = string.Template(
+    """
     <html>
       <head>
         <title>Monmail Dashboard</title>
         <style>
-          body {{ font-family: Arial, sans-serif; margin: 2rem; background: #0f172a; color: #e2e8f0; }}
-          .cards {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(160px, 1fr)); gap: 1rem; }}
-          .card {{ background: #1e293b; padding: 1rem; border-radius: 0.5rem; }}
-          h1 {{ margin-bottom: 1rem; }}
+          body { font-family: Arial, sans-serif; margin: 2rem; background: #0f172a; color: #e2e8f0; }
+          .cards { display: grid; grid-template-columns: repeat(auto-fit, minmax(160px, 1fr)); gap: 1rem; }
+          .card { background: #1e293b; padding: 1rem; border-radius: 0.5rem; }
+          h1 { margin-bottom: 1rem; }
         </style>
       </head>
       <body>
         <h1>Monmail Threat Intel</h1>
         <div class="cards">
-          <div class="card">Alerts<br/><strong>{stats['alert_count']}</strong></div>
-          <div class="card">Detections<br/><strong>{stats['detection_count']}</strong></div>
-          <div class="card">Events<br/><strong>{stats['event_count']}</strong></div>
-          <div class="card">Incidents<br/><strong>{stats['incident_count']}</strong></div>
-          <div class="card">Cases<br/><strong>{stats['case_count']}</strong></div>
+          <div class="card">Alerts<br/><strong>${alert_count}</strong></div>
+          <div class="card">Detections<br/><strong>${detection_count}</strong></div>
+          <div class="card">Events<br/><strong>${event_count}</strong></div>
+          <div class="card">Incidents<br/><strong>${incident_count}</strong></div>
+          <div class="card">Cases<br/><strong>${case_count}</strong></div>
         </div>
       </body>
     </html>
     """
+)
 
 
-def _flatten_event_context(payload: dict) -> dict:
-    smtp = payload.get("smtp") or {}
-    email = payload.get("email") or {}
-    dns = payload.get("dns") or {}
-    host = payload.get("host") or {}
-    sensor = payload.get("sensor") or {}
-    tenant = payload.get("tenant") or {}
-    asset = payload.get("asset") or {}
-    user = payload.get("user") or {}
-    attachment = payload.get("attachment") or {}
-
-    return {
-        "smtp_mail_from": smtp.get("mail_from"),
-        "smtp_rcpt_to": smtp.get("rcpt_to"),
-        "smtp_helo": smtp.get("helo"),
-        "smtp_status": smtp.get("status"),
-        "email_subject": email.get("subject"),
-        "email_message_id": email.get("message_id"),
-        "email_client_ip": email.get("client_ip"),
-        "attachment_hash": attachment.get("hash"),
-        "url": payload.get("url"),
-        "dns_query": dns.get("query"),
-        "dns_qtype": dns.get("qtype"),
-        "dns_rcode": dns.get("rcode"),
-        "dns_server": dns.get("server"),
-        "client_ip": payload.get("client_ip"),
-        "resolved_ip": payload.get("resolved_ip"),
-        "host_name": host.get("name"),
-        "sensor_id": sensor.get("id"),
-        "tenant_id": tenant.get("id"),
-        "asset_id": asset.get("id"),
-        "asset_criticality": asset.get("criticality"),
-        "user_name": user.get("name"),
-    }
+@app.get("/", response_class=HTMLResponse)
+def dashboard_ui() -> str:
+    return _DASH_TPL.substitute(get_dashboard_stats())
+
+
+# events table column -> (submodel attribute, field attribute) on EventIn.
+_FLATTEN_SPEC: dict[str, tuple[str, str]] = {
+    "smtp_mail_from": ("smtp", "mail_from"),
+    "smtp_rcpt_to": ("smtp", "rcpt_to"),
+    "smtp_helo": ("smtp", "helo"),
+    "smtp_status": ("smtp", "status"),
+    "email_subject": ("email", "subject"),
+    "email_message_id": ("email", "message_id"),
+    "email_client_ip": ("email", "client_ip"),
+    "attachment_hash": ("attachment", "hash"),
+    "dns_query": ("dns", "query"),
+    "dns_qtype": ("dns", "qtype"),
+    "dns_rcode": ("dns", "rcode"),
+    "dns_server": ("dns", "server"),
+    "host_name": ("host", "name"),
+    "sensor_id": ("sensor", "id"),
+    "tenant_id": ("tenant", "id"),
+    "asset_id": ("asset", "id"),
+    "asset_criticality": ("asset", "criticality"),
+    "user_name": ("user", "name"),
+}
+
+_NESTED_FIELDS = {submodel for submodel, _ in _FLATTEN_SPEC.values()}
+
+
+def _build_flattener():
+    # Specialize the column mapping into straight attribute reads, compiled once.
+    lines = ["def _flatten_event(event):", "    return {"]
+    for column, (submodel, attr) in _FLATTEN_SPEC.items():
+        lines.append(
+            f'        "{column}": event.{submodel}.{attr} if event.{submodel} else None,'
+        )
+    lines.append("    }")
+    namespace: dict = {}
+    exec("\n".join(lines), namespace)
+    return namespace["_flatten_event"]
+
+
+_flatten_event = _build_flattener()
+
+
+def _prepare_event(event: EventIn, source: str | None = None) -> tuple[dict, dict, dict, list[dict]]:
+    event_payload = event.model_dump(exclude=_NESTED_FIELDS, exclude_none=True, exclude_unset=True)
+    event_payload["source"] = source or event.source
+    event_payload["event_time"] = event_payload.get("event_time") or datetime.now(timezone.utc).isoformat()
+    event_payload.update(_flatten_event(event))
+    metadata = event_payload.get("metadata") or {}
+    normalized_fields = normalize_event_fields(event_payload, metadata)
+    indicators = extract_event_indicators(event_payload, metadata)
+    metadata["normalized"] = normalized_fields
+    metadata["extracted_iocs"] = serialize_indicators(indicators)
+    event_payload["metadata"] = _dumps(metadata)
+    return event_payload, metadata, normalized_fields, indicators
+
+
+@app.post("/ingest/batch")
+def ingest_batch(events: list[EventIn], background_tasks: BackgroundTasks) -> list[dict]:
+    start_time = time.monotonic()
+    conn = get_connection(DB_PATH)
+    rules = get_rules()
+
+    prepared = [_prepare_event(event) for event in events]
+
+    results: list[dict] = []
+    pending_emails: list[tuple[str, str]] = []
+    with transaction(conn):
+        event_ids = insert_events_many(conn, [entry[0] for entry in prepared])
+        for (event_payload, metadata, normalized_fields, indicators), batch_event_id in zip(
+            prepared, event_ids
+        ):
+            event_id, alerts, emails = _store_event(
+                conn, event_payload, metadata, rules, normalized_fields, indicators,
+                event_id=batch_event_id,
+            )
+            pending_emails.extend(emails)
+            if alerts:
+                results.append({"status": "alerted", "alerts": alerts})
+            else:
+                results.append({"status": "stored", "event_id": event_id})
+
+    for subject, body in pending_emails:
+        background_tasks.add_task(send_email_alert, subject, body)
+
+    if prepared:
+        per_event = (time.monotonic() - start_time) / len(prepared)
+        for event_payload, _, _, _ in prepared:
+            INGEST_DURATION.labels(event_payload["source"]).observe(per_event)
+    return results
 
 
 @app.post("/ingest")
 @app.post("/ingest/{source}")
-def ingest_event(event: EventIn, source: str | None = None) -> dict:
+def ingest_event(event: EventIn, background_tasks: BackgroundTasks, source: str | None = None) -> dict:
     start_time = time.monotonic()
     conn = get_connection(DB_PATH)
-    init_db(conn)
-    rules = load_rules(RULES_PATH)
+    rules = get_rules()
 
-    event_payload = event.model_dump()
-    event_payload["source"] = source or event.source
-    event_payload["event_time"] = event_payload["event_time"] or datetime.now(timezone.utc).isoformat()
-    event_payload.update(_flatten_event_context(event_payload))
-    metadata = event_payload.get("metadata", {})
-    normalized_fields = normalize_event_fields(event_payload, metadata)
-    indicators = extract_event_indicators(event_payload, metadata)
-    metadata["normalized"] = normalized_fields
-    metadata["extracted_iocs"] = serialize_indicators(indicators)
-    event_payload["metadata"] = json.dumps(metadata)
+    event_payload, metadata, normalized_fields, indicators = _prepare_event(event, source)
+
+    with transaction(conn):
+        event_id, alerts, pending_emails = _store_event(
+            conn, event_payload, metadata, rules, normalized_fields, indicators
+        )
+
+    for subject, body in pending_emails:
+        background_tasks.add_task(send_email_alert, subject, body)
 
-    event_id = insert_event(conn, event_payload)
+    INGEST_DURATION.labels(event_payload["source"]).observe(time.monotonic() - start_time)
+    if not alerts:
+        return {"status": "stored", "event_id": event_id}
+    return {"status": "alerted", "alerts": alerts}
+
+
+def _store_event(
+    conn,
+    event_payload: dict,
+    metadata: dict,
+    rules: list[dict],
+    normalized_fields: dict,
+    indicators: list[dict],
+    event_id: int | None = None,
+) -> tuple[int, list[dict], list[tuple[str, str]]]:
+    if KNOWN_INDICATORS.stale():
+        KNOWN_INDICATORS.load(fetch_indicator_keys(conn))
+
+    if event_id is None:
+        event_id = insert_event(conn, event_payload)
     event_payload["id"] = event_id
     EVENTS_INGESTED.labels(event_payload["source"]).inc()
 
     enrichment = enrich_event(event_payload, DATA_DIR)
     if enrichment:
-        metadata = json.loads(event_payload["metadata"])
         metadata["enrichment"] = enrichment
-        event_payload["metadata"] = json.dumps(metadata)
+        event_payload["metadata"] = _dumps(metadata)
         update_event_metadata(conn, event_id, event_payload["metadata"])
 
     detections = evaluate_event(event_payload, rules)
     now = now_iso()
+    sighting_rows: list[dict] = []
+    sighting_matches: list[dict] = []
+    sighting_keys: set[tuple] = set()
+    match_lists: list[tuple[dict, list[dict] | None]] = []
+    misses: list[dict] = []
     for indicator in indicators:
+        if not KNOWN_INDICATORS.might_contain(indicator["indicator_type"], indicator["value"]):
+            continue
         cached = HOT_INDICATOR_CACHE.get(indicator["indicator_type"], indicator["value"])
         if cached is None:
-            rows = fetch_indicator_matches(
-                conn,
-                indicator["indicator_type"],
-                indicator["value"],
-                now,
-            )
-            cached = [dict(row) for row in rows]
-            HOT_INDICATOR_CACHE.set(indicator["indicator_type"], indicator["value"], cached)
+            misses.append(indicator)
+        match_lists.append((indicator, cached))
+
+    if misses:
+        rows = fetch_indicator_matches_many(
+            conn, [(miss["indicator_type"], miss["value"]) for miss in misses], now
+        )
+        grouped: dict[tuple[str, str], list[dict]] = {}
+        for row in rows:
+            match = dict(zip(row.keys(), row))
+            grouped.setdefault((match["indicator_type"], match["value"]), []).append(match)
+        for miss in misses:
+            key = (miss["indicator_type"], miss["value"])
+            HOT_INDICATOR_CACHE.set(miss["indicator_type"], miss["value"], grouped.get(key, []))
+
+    for indicator, cached in match_lists:
+        if cached is None:
+            cached = HOT_INDICATOR_CACHE.get(indicator["indicator_type"], indicator["value"]) or []
         matches = cached
+        if not matches:
+            continue
+        context = _dumps(
+            {
+                "source": event_payload["source"],
+                "normalized": normalized_fields,
+            }
+        )
         for match in matches:
-            score_delta = score_sighting(match["confidence"], match["severity"])
-            sighting_id = insert_sighting(
-                conn,
+            key = (match["id"], indicator["matched_field"], indicator["matched_value"])
+            if key in sighting_keys:
+                continue
+            sighting_keys.add(key)
+            sighting_rows.append(
                 {
                     "indicator_id": match["id"],
                     "event_id": event_id,
                     "matched_field": indicator["matched_field"],
                     "matched_value": indicator["matched_value"],
                     "timestamp": now,
-                    "context": json.dumps(
-                        {
-                            "source": event_payload["source"],
-                            "normalized": normalized_fields,
-                        }
-                    ),
-                    "score_delta": score_delta,
-                },
+                    "context": context,
+                    "score_delta": score_sighting(match["confidence"], match["severity"]),
+                }
             )
-            if sighting_id:
-                SIGHTINGS_CREATED.labels(match["indicator_type"], match["source"]).inc()
-                detections.append(
-                    {
-                        "event_id": event_id,
-                        "detection_type": "cti_match",
-                        "severity": match["severity"],
-                        "confidence": match["confidence"],
-                        "rule": f"{match['source']}:{match['indicator_type']}",
-                        "created_at": now,
-                    }
-                )
+            sighting_matches.append(match)
+
+    insert_sightings_many(conn, sighting_rows)
+    for match in sighting_matches:
+        SIGHTINGS_CREATED.labels(match["indicator_type"], match["source"]).inc()
+        detections.append(
+            {
+                "event_id": event_id,
+                "detection_type": "cti_match",
+                "severity": match["severity"],
+                "confidence": match["confidence"],
+                "rule": f"{match['source']}:{match['indicator_type']}",
+                "created_at": now,
+            }
+        )
+
+    alerts: list[dict] = []
+    pending_emails: list[tuple[str, str]] = []
     if not detections:
-        INGEST_DURATION.labels(event_payload["source"]).observe(time.monotonic() - start_time)
-        return {"status": "stored", "event_id": event_id}
+        return event_id, alerts, pending_emails
 
-    alerts = []
-    for detection in detections:
-        detection_id = insert_detection(conn, detection)
+    detection_ids = insert_detections_many(conn, detections)
+    for detection, detection_id in zip(detections, detection_ids):
         detection["id"] = detection_id
         DETECTIONS_CREATED.labels(detection["detection_type"], detection["severity"]).inc()
-        alert = build_alert(detection, event_payload)
-        alert_id = insert_alert(conn, alert)
+        alerts.append(build_alert(detection, event_payload))
+
+    alert_ids = insert_alerts_many(conn, alerts)
+    incident_key = build_incident_key(event_payload, normalized_fields)
+    for detection, alert, alert_id in zip(detections, alerts, alert_ids):
         alert["id"] = alert_id
-        alerts.append(alert)
         ALERTS_CREATED.labels(alert["severity"]).inc()
-
-        incident_key = build_incident_key(event_payload, normalized_fields)
         update_incident(conn, incident_key, detection["severity"], detection["created_at"])
-
         if detection["severity"] in {"critical", "high"}:
-            send_email_alert(alert["title"], alert["details"])
+            pending_emails.append((alert["title"], alert["details"]))
 
-    INGEST_DURATION.labels(event_payload["source"]).observe(time.monotonic() - start_time)
-    return {"status": "alerted", "alerts": alerts}
+    return event_id, alerts, pending_emails
 
 
 @app.post("/indicators/ingest")
 def ingest_indicator(indicator: IndicatorIn) -> dict:
     conn = get_connection(DB_PATH)
-    init_db(conn)
     payload = indicator.model_dump()
     timestamp = now_iso()
     payload["indicator_type"] = payload["indicator_type"].lower()
@@ -350,18 +595,21 @@ def ingest_indicator(indicator: IndicatorIn) -> dict:
     payload["last_seen"] = payload["last_seen"] or timestamp
     payload["revoked"] = 1 if payload.get("revoked") else 0
     payload["false_positive"] = 1 if payload.get("false_positive") else 0
-    payload["raw_payload"] = json.dumps(payload["raw_payload"]) if payload.get("raw_payload") else None
-    payload["tags"] = json.dumps(payload["tags"]) if payload.get("tags") else None
+    payload["raw_payload"] = _dumps(payload["raw_payload"]) if payload.get("raw_payload") else None
+    payload["tags"] = _dumps(payload["tags"]) if payload.get("tags") else None
     payload["relationships"] = (
-        json.dumps(payload["relationships"]) if payload.get("relationships") else None
+        _dumps(payload["relationships"]) if payload.get("relationships") else None
     )
-    indicator_id = upsert_indicator(conn, payload)
+    with transaction(conn):
+        indicator_id = upsert_indicator(conn, payload)
+    KNOWN_INDICATORS.add(payload["indicator_type"], payload["value"])
+    HOT_INDICATOR_CACHE.invalidate(payload["indicator_type"], payload["value"])
     return {"status": "stored", "indicator_id": indicator_id}
 
 
 @app.post("/ingest/raw")
-def ingest_raw(payload: dict) -> dict:
+def ingest_raw(payload: dict, background_tasks: BackgroundTasks) -> dict:
     if "raw" not in payload:
         raise HTTPException(status_code=400, detail="Missing raw field")
     event = EventIn(**payload)
-    return ingest_event(event)
+    return ingest_event(event, background_tasks)
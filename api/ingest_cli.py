@@ -3,22 +3,46 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
+
+
+def _post(session: requests.Session, endpoint: str, payload: object) -> None:
+    response = session.post(endpoint, json=payload, timeout=10)
+    response.raise_for_status()
+    print(response.json())
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--endpoint", required=True)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--flush-interval", type=float, default=5.0)
     args = parser.parse_args()
 
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    batch: list[dict] = []
+    last_flush = time.monotonic()
     for line in sys.stdin:
         if not line.strip():
             continue
         payload = json.loads(line)
-        response = requests.post(args.endpoint, json=payload, timeout=10)
-        response.raise_for_status()
-        print(response.json())
+        if args.batch_size <= 1:
+            _post(session, args.endpoint, payload)
+            continue
+        batch.append(payload)
+        if len(batch) >= args.batch_size or time.monotonic() - last_flush >= args.flush_interval:
+            _post(session, args.endpoint, batch)
+            batch = []
+            last_flush = time.monotonic()
+    if batch:
+        _post(session, args.endpoint, batch)
 
 
 if __name__ == "__main__":
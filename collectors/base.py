@@ -1,8 +1,60 @@
 from __future__ import annotations
 
-import json
+import os
+import socket
+import struct
 from datetime import datetime, timezone
 
+import orjson
+
+_LENGTH_PREFIX = struct.Struct(">I")
+
+
+class EventSink:
+    def emit(self, event: dict) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class StdoutSink(EventSink):
+    def emit(self, event: dict) -> None:
+        print(orjson.dumps(event).decode())
+
+
+class UnixSocketSink(EventSink):
+    """Sends length-prefixed orjson frames straight to the API's ingest socket.
+
+    Skips the NDJSON-print / re-parse / HTTP hop entirely when collectors are
+    co-located with the API process.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(path)
+
+    def emit(self, event: dict) -> None:
+        payload = orjson.dumps(event)
+        self._sock.sendall(_LENGTH_PREFIX.pack(len(payload)) + payload)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+_SINK: EventSink | None = None
+
+
+def get_sink() -> EventSink:
+    global _SINK
+    if _SINK is None:
+        target = os.getenv("MONMAIL_EVENT_SINK", "stdout")
+        if target.startswith("unix:"):
+            _SINK = UnixSocketSink(target.removeprefix("unix:"))
+        else:
+            _SINK = StdoutSink()
+    return _SINK
+
 
 def emit_event(source: str, raw: str, source_ip: str | None, destination: str | None, metadata: dict) -> None:
     event = {
@@ -10,7 +62,7 @@ def emit_event(source: str, raw: str, source_ip: str | None, destination: str |
         "event_time": datetime.now(timezone.utc).isoformat(),
         "source_ip": source_ip,
         "destination": destination,
-        "metadata": json.dumps(metadata),
+        "metadata": metadata,
         "raw": raw.strip(),
     }
-    print(json.dumps(event))
+    get_sink().emit(event)
@@ -3,33 +3,56 @@ from __future__ import annotations
 import argparse
 import re
 
+import orjson
+
 from collectors.base import emit_event
 
-DNS_PATTERN = re.compile(r"client (?P<ip>[\d\.]+)#\d+: query: (?P<domain>[^ ]+) IN (?P<qtype>\w+)")
+DNS_PATTERN = re.compile(
+    rb"client (?P<ip>[\d.]++)#\d++: query: (?P<domain>[^ ]++) IN (?P<qtype>\w++)", re.ASCII
+)
 
 
-def parse_line(line: str) -> dict:
+def parse_line(line: bytes) -> dict:
     match = DNS_PATTERN.search(line)
     if not match:
         return {}
     return {
-        "client_ip": match.group("ip"),
-        "domain": match.group("domain"),
-        "query_type": match.group("qtype"),
+        "client_ip": match.group("ip").decode(),
+        "domain": match.group("domain").decode(),
+        "query_type": match.group("qtype").decode(),
+    }
+
+
+def parse_json_line(line: bytes) -> dict:
+    # BIND structured (JSON channel / dnstap-read --json) query logs; no regex.
+    try:
+        record = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return {}
+    domain = record.get("qname") or record.get("query")
+    client_ip = record.get("client_ip") or record.get("client")
+    if not domain or not client_ip:
+        return {}
+    return {
+        "client_ip": client_ip,
+        "domain": domain,
+        "query_type": record.get("qtype") or record.get("query_type"),
     }
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--path", required=True)
+    parser.add_argument("--format", choices=["regex", "json"], default="regex")
     args = parser.parse_args()
-    with open(args.path, "r", encoding="utf-8", errors="ignore") as handle:
+    parse = parse_json_line if args.format == "json" else parse_line
+    with open(args.path, "rb") as handle:
         for line in handle:
-            parsed = parse_line(line)
+            parsed = parse(line)
             if parsed:
                 emit_event(
                     source="dns",
-                    raw=line,
+                    raw=line.decode("utf-8", errors="ignore"),
                     source_ip=parsed["client_ip"],
                     destination=parsed["domain"],
                     metadata=parsed,
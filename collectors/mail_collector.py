@@ -3,33 +3,57 @@ from __future__ import annotations
 import argparse
 import re
 
+import orjson
+
 from collectors.base import emit_event
 
-MAIL_PATTERN = re.compile(r"from=<(?P<from>[^>]+)>.*to=<(?P<to>[^>]+)>.*client=(?P<ip>[\d\.]+)")
+MAIL_PATTERN = re.compile(
+    rb"from=<(?P<from>[^>]++)>.*?to=<(?P<to>[^>]++)>.*?client=(?P<ip>[\d.]++)", re.ASCII
+)
 
 
-def parse_line(line: str) -> dict:
+def parse_line(line: bytes) -> dict:
     match = MAIL_PATTERN.search(line)
     if not match:
         return {}
     return {
-        "sender": match.group("from"),
-        "recipient": match.group("to"),
-        "source_ip": match.group("ip"),
+        "sender": match.group("from").decode(),
+        "recipient": match.group("to").decode(),
+        "source_ip": match.group("ip").decode(),
+    }
+
+
+def parse_json_line(line: bytes) -> dict:
+    # Postfix structured (postlog JSON) lines; no regex.
+    try:
+        record = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return {}
+    sender = record.get("from") or record.get("sender")
+    recipient = record.get("to") or record.get("recipient")
+    client_ip = record.get("client") or record.get("client_ip")
+    if not sender or not recipient or not client_ip:
+        return {}
+    return {
+        "sender": sender,
+        "recipient": recipient,
+        "source_ip": client_ip,
     }
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--path", required=True)
+    parser.add_argument("--format", choices=["regex", "json"], default="regex")
     args = parser.parse_args()
-    with open(args.path, "r", encoding="utf-8", errors="ignore") as handle:
+    parse = parse_json_line if args.format == "json" else parse_line
+    with open(args.path, "rb") as handle:
         for line in handle:
-            parsed = parse_line(line)
+            parsed = parse(line)
             if parsed:
                 emit_event(
                     source="mail",
-                    raw=line,
+                    raw=line.decode("utf-8", errors="ignore"),
                     source_ip=parsed["source_ip"],
                     destination=parsed["recipient"],
                     metadata=parsed,
@@ -1,14 +1,36 @@
 from __future__ import annotations
 
 import argparse
+import mmap
 import re
 
 from collectors.base import emit_event
 
 AUTH_PATTERN = re.compile(r"Failed password for (?P<user>\w+) from (?P<ip>[\d\.]+)")
 
+_AUTH_TOKEN = "Failed password for "
+
 
 def parse_line(line: str) -> dict:
+    # Fast path: the signal token is a literal, so partition the line
+    # instead of running the regex engine; fall back to the regex when
+    # the layout is unexpected.
+    idx = line.find(_AUTH_TOKEN)
+    if idx < 0:
+        return {}
+    tail = line[idx + len(_AUTH_TOKEN):]
+    user, sep, rest = tail.partition(" from ")
+    ip = rest.split(" ", 1)[0].strip() if sep else ""
+    if not sep or not user.isalnum() or not ip.replace(".", "").isdigit():
+        return _parse_line_regex(line)
+    return {
+        "user": user,
+        "source_ip": ip,
+        "event": "failed_login",
+    }
+
+
+def _parse_line_regex(line: str) -> dict:
     match = AUTH_PATTERN.search(line)
     if not match:
         return {}
@@ -19,21 +41,46 @@ def parse_line(line: str) -> dict:
     }
 
 
+def _emit_parsed(line: str) -> None:
+    parsed = parse_line(line)
+    if parsed:
+        emit_event(
+            source="syslog",
+            raw=line,
+            source_ip=parsed["source_ip"],
+            destination=None,
+            metadata=parsed,
+        )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--path", required=True)
     args = parser.parse_args()
-    with open(args.path, "r", encoding="utf-8", errors="ignore") as handle:
-        for line in handle:
-            parsed = parse_line(line)
-            if parsed:
-                emit_event(
-                    source="syslog",
-                    raw=line,
-                    source_ip=parsed["source_ip"],
-                    destination=None,
-                    metadata=parsed,
-                )
+    needle = _AUTH_TOKEN.encode()
+    with open(args.path, "rb") as handle:
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Pipes, character devices and empty files cannot be mapped;
+            # fall back to plain buffered line iteration.
+            for raw_line in handle:
+                _emit_parsed(raw_line.decode("utf-8", errors="ignore"))
+            return
+        # Jump between occurrences of the literal token and decode only
+        # those lines; the ~99% of lines without it are never touched as str.
+        with mapped:
+            start = 0
+            while True:
+                index = mapped.find(needle, start)
+                if index < 0:
+                    break
+                line_start = mapped.rfind(b"\n", 0, index) + 1
+                line_end = mapped.find(b"\n", index)
+                if line_end < 0:
+                    line_end = len(mapped)
+                _emit_parsed(mapped[line_start:line_end].decode("utf-8", errors="ignore"))
+                start = line_end + 1
 
 
 if __name__ == "__main__":
@@ -1,50 +1,159 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from urllib.parse import urlparse
+import time
+from datetime import datetime
+from functools import lru_cache
 
 
 def _email_domain(address: str | None) -> str | None:
-    if not address or "@" not in address:
+    index = address.find("@") if address else -1
+    if index < 0:
         return None
-    return address.split("@", 1)[1].lower()
+    return address[index + 1 :].lower()
 
 
 def _url_domain(url: str | None) -> str | None:
+    # Hand-rolled hostname slice; urlparse builds a ParseResult and runs
+    # several internal regexes just to get this far.
     if not url:
         return None
-    parsed = urlparse(url)
-    return parsed.hostname.lower() if parsed.hostname else None
+    start = url.find("://")
+    if start < 0:
+        return None
+    start += 3
+    end = len(url)
+    for stop in ("/", "?", "#"):
+        index = url.find(stop, start)
+        if 0 <= index < end:
+            end = index
+    host = url[start:end]
+    if "@" in host:
+        host = host.rsplit("@", 1)[1]
+    if host.startswith("["):
+        closing = host.find("]")
+        return host[1:closing].lower() or None if closing > 0 else None
+    port = host.find(":")
+    if port >= 0:
+        host = host[:port]
+    return host.lower() or None
 
 
 def build_incident_key(event: dict, normalized_fields: dict | None = None) -> str:
     normalized_fields = normalized_fields or {}
-    source = event.get("source", "unknown")
-    tenant_id = event.get("tenant_id") or "tenant-unknown"
-    asset_id = event.get("asset_id") or "asset-unknown"
-    source_ip = event.get("source_ip") or normalized_fields.get("src_ip") or "ip-unknown"
-    destination = event.get("destination") or "dest-unknown"
+    return _build_incident_key(
+        event.get("source", "unknown"),
+        event.get("tenant_id"),
+        event.get("asset_id"),
+        event.get("source_ip"),
+        event.get("destination"),
+        event.get("smtp_mail_from"),
+        event.get("smtp_rcpt_to"),
+        event.get("dns_query"),
+        event.get("client_ip"),
+        event.get("url"),
+        normalized_fields.get("src_ip"),
+        normalized_fields.get("mail_from"),
+        normalized_fields.get("rcpt_to"),
+        normalized_fields.get("domain"),
+        normalized_fields.get("url"),
+    )
+
+
+@lru_cache(maxsize=8192)
+def _build_incident_key(
+    source: str,
+    tenant_id: str | None,
+    asset_id: str | None,
+    source_ip: str | None,
+    destination: str | None,
+    smtp_mail_from: str | None,
+    smtp_rcpt_to: str | None,
+    dns_query: str | None,
+    client_ip: str | None,
+    url: str | None,
+    norm_src_ip: str | None,
+    norm_mail_from: str | None,
+    norm_rcpt_to: str | None,
+    norm_domain: str | None,
+    norm_url: str | None,
+) -> str:
+    tenant_id = tenant_id or "tenant-unknown"
+    asset_id = asset_id or "asset-unknown"
+    source_ip = source_ip or norm_src_ip or "ip-unknown"
+    destination = destination or "dest-unknown"
 
     if source == "mail":
-        sender_domain = _email_domain(event.get("smtp_mail_from")) or _email_domain(
-            normalized_fields.get("mail_from")
-        )
-        rcpt_domain = _email_domain(event.get("smtp_rcpt_to")) or _email_domain(
-            normalized_fields.get("rcpt_to")
+        sender_domain = _email_domain(smtp_mail_from) or _email_domain(norm_mail_from)
+        rcpt_domain = _email_domain(smtp_rcpt_to) or _email_domain(norm_rcpt_to)
+        return ":".join(
+            (
+                "mail",
+                tenant_id,
+                asset_id,
+                sender_domain or "sender-unknown",
+                rcpt_domain or "rcpt-unknown",
+                source_ip,
+            )
         )
-        return f"mail:{tenant_id}:{asset_id}:{sender_domain or 'sender-unknown'}:{rcpt_domain or 'rcpt-unknown'}:{source_ip}"
 
     if source == "dns":
-        query = event.get("dns_query") or normalized_fields.get("domain") or destination
-        client_ip = event.get("client_ip") or normalized_fields.get("src_ip") or source_ip
-        return f"dns:{tenant_id}:{asset_id}:{query}:{client_ip}"
+        query = dns_query or norm_domain or destination
+        resolver_client = client_ip or norm_src_ip or source_ip
+        return ":".join(("dns", tenant_id, asset_id, query, resolver_client))
+
+    url_domain = _url_domain(url) or norm_domain
+    primary = url_domain or norm_url or destination
+    return ":".join((source, tenant_id, asset_id, primary, source_ip))
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    # Howard Hinnant's algorithm: days since 1970-01-01 for a proleptic
+    # Gregorian date, no datetime objects involved.
+    year -= month <= 2
+    era = (year if year >= 0 else year - 399) // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
 
-    url_domain = _url_domain(event.get("url")) or normalized_fields.get("domain")
-    primary = url_domain or normalized_fields.get("url") or destination
-    return f"{source}:{tenant_id}:{asset_id}:{primary}:{source_ip}"
+@lru_cache(maxsize=1024)
+def _parse_iso_to_epoch(timestamp: str) -> float:
+    # Fast character-arithmetic path for the UTC shapes this codebase
+    # emits (YYYY-MM-DDTHH:MM:SS[.ffffff](Z|+00:00)); anything else falls
+    # back to datetime.fromisoformat. A C extension (timegm via
+    # Cython/CFFI) would buy little over this on top of the lru_cache.
+    try:
+        if (
+            len(timestamp) >= 19
+            and timestamp[4] == "-"
+            and timestamp[7] == "-"
+            and timestamp[10] in "T "
+            and timestamp[13] == ":"
+            and timestamp[16] == ":"
+        ):
+            tail = timestamp[19:]
+            fraction = 0.0
+            if tail.startswith("."):
+                index = 1
+                while index < len(tail) and tail[index].isdigit():
+                    index += 1
+                fraction = float(tail[:index])
+                tail = tail[index:]
+            if tail in ("Z", "+00:00"):
+                days = _days_from_civil(
+                    int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10])
+                )
+                seconds = (
+                    int(timestamp[11:13]) * 3600
+                    + int(timestamp[14:16]) * 60
+                    + int(timestamp[17:19])
+                )
+                return days * 86400 + seconds + fraction
+    except ValueError:
+        pass
+    return datetime.fromisoformat(timestamp).timestamp()
 
 
 def within_window(timestamp: str, window_minutes: int = 60) -> bool:
-    now = datetime.now(timezone.utc)
-    event_time = datetime.fromisoformat(timestamp)
-    return now - event_time <= timedelta(minutes=window_minutes)
+    return time.time() - _parse_iso_to_epoch(timestamp) <= window_minutes * 60
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import csv
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -11,18 +12,33 @@ def load_csv(path: str) -> list[dict]:
         return list(csv.DictReader(handle))
 
 
-def enrich_event(event: dict, data_dir: str) -> dict:
+@lru_cache(maxsize=None)
+def _load_reputation(data_dir: str, filename: str, key: str, default_reason: str) -> dict[str, str]:
+    rows = load_csv(str(Path(data_dir) / filename))
+    return {row[key]: row.get("reason", default_reason) for row in rows if row.get(key)}
+
+
+def _enrich_one(event: dict, domain_blacklist: dict[str, str], ip_reputation: dict[str, str]) -> dict:
     enrichment = {}
-    domain_blacklist = load_csv(str(Path(data_dir) / "domain_blacklist.csv"))
-    ip_reputation = load_csv(str(Path(data_dir) / "ip_reputation.csv"))
     domain = event.get("destination")
     source_ip = event.get("source_ip")
-    if domain:
-        matches = [row for row in domain_blacklist if row.get("domain") == domain]
-        if matches:
-            enrichment["domain_reputation"] = matches[0].get("reason", "blacklisted")
-    if source_ip:
-        matches = [row for row in ip_reputation if row.get("ip") == source_ip]
-        if matches:
-            enrichment["ip_reputation"] = matches[0].get("reason", "suspicious")
+    if domain and domain in domain_blacklist:
+        enrichment["domain_reputation"] = domain_blacklist[domain]
+    if source_ip and source_ip in ip_reputation:
+        enrichment["ip_reputation"] = ip_reputation[source_ip]
     return enrichment
+
+
+def enrich_event(event: dict, data_dir: str) -> dict:
+    return _enrich_one(
+        event,
+        _load_reputation(data_dir, "domain_blacklist.csv", "domain", "blacklisted"),
+        _load_reputation(data_dir, "ip_reputation.csv", "ip", "suspicious"),
+    )
+
+
+def enrich_events_batch(events: list[dict], data_dir: str) -> list[dict]:
+    """Enrich a batch of events against the reputation tables fetched once."""
+    domain_blacklist = _load_reputation(data_dir, "domain_blacklist.csv", "domain", "blacklisted")
+    ip_reputation = _load_reputation(data_dir, "ip_reputation.csv", "ip", "suspicious")
+    return [_enrich_one(event, domain_blacklist, ip_reputation) for event in events]
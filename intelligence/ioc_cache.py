@@ -1,25 +1,130 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
+Key = tuple[str, str]
+
+# The five indicator types are interned so cache keys always carry the same
+# string singletons: tuple comparison inside the dict probe then succeeds on
+# pointer equality without ever comparing characters.
+_TYPE_INTERN = {name: name for name in ("ip", "domain", "email", "url", "hash")}
+
+
+def _intern_type(indicator_type: str) -> str:
+    return _TYPE_INTERN.get(indicator_type, indicator_type)
+
 
 class HotIndicatorCache:
-    def __init__(self, ttl_seconds: int = 300) -> None:
-        self.ttl = timedelta(seconds=ttl_seconds)
-        self._store: dict[tuple[str, str], tuple[datetime, list[dict[str, Any]]]] = {}
+    """TTL cache of indicator match lists with ARC replacement.
+
+    Plain LRU is near-pessimal under one-shot indicator scans (bulk feed
+    refreshes, reconnaissance bursts): a single pass evicts every hot entry.
+    ARC (Megiddo-Modha) keeps recency (t1) and frequency (t2) lists plus
+    ghost lists (b1/b2) that adapt the split, so scan traffic cycles through
+    t1 without displacing indicators that are hit repeatedly.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, capacity: int = 4096) -> None:
+        self.ttl_ns = ttl_seconds * 1_000_000_000
+        self.capacity = capacity
+        # get/set run on FastAPI threadpool and ingest-socket threads while
+        # invalidate() is called outside any transaction; the four lists must
+        # move together or concurrent mutation corrupts the ARC state.
+        self._lock = threading.Lock()
+        self._t1: OrderedDict[Key, tuple[int, list[dict[str, Any]]]] = OrderedDict()
+        self._t2: OrderedDict[Key, tuple[int, list[dict[str, Any]]]] = OrderedDict()
+        self._b1: OrderedDict[Key, None] = OrderedDict()
+        self._b2: OrderedDict[Key, None] = OrderedDict()
+        self._p = 0
 
     def get(self, indicator_type: str, value: str) -> list[dict[str, Any]] | None:
-        key = (indicator_type, value)
-        entry = self._store.get(key)
-        if not entry:
-            return None
-        expires_at, data = entry
-        if datetime.now(timezone.utc) >= expires_at:
-            self._store.pop(key, None)
-            return None
-        return data
+        key = (_intern_type(indicator_type), value)
+        with self._lock:
+            entry = self._t1.pop(key, None)
+            if entry is None:
+                entry = self._t2.pop(key, None)
+                if entry is None:
+                    return None
+            expires_ns, data = entry
+            if time.monotonic_ns() >= expires_ns:
+                return None
+            self._t2[key] = entry
+            return data
 
     def set(self, indicator_type: str, value: str, data: list[dict[str, Any]]) -> None:
-        expires_at = datetime.now(timezone.utc) + self.ttl
-        self._store[(indicator_type, value)] = (expires_at, data)
+        key = (_intern_type(indicator_type), value)
+        entry = (time.monotonic_ns() + self.ttl_ns, data)
+        with self._lock:
+            if key in self._t1 or key in self._t2:
+                self._t1.pop(key, None)
+                self._t2.pop(key, None)
+                self._t2[key] = entry
+                return
+            if key in self._b1:
+                self._p = min(self.capacity, self._p + max(1, len(self._b2) // max(1, len(self._b1))))
+                self._replace(key)
+                del self._b1[key]
+                self._t2[key] = entry
+                return
+            if key in self._b2:
+                self._p = max(0, self._p - max(1, len(self._b1) // max(1, len(self._b2))))
+                self._replace(key)
+                del self._b2[key]
+                self._t2[key] = entry
+                return
+            if len(self._t1) + len(self._b1) == self.capacity:
+                if len(self._t1) < self.capacity:
+                    self._b1.popitem(last=False)
+                    self._replace(key)
+                else:
+                    self._t1.popitem(last=False)
+            elif len(self._t1) + len(self._t2) + len(self._b1) + len(self._b2) >= self.capacity:
+                if len(self._t1) + len(self._t2) + len(self._b1) + len(self._b2) >= 2 * self.capacity:
+                    self._b2.popitem(last=False)
+                self._replace(key)
+            self._t1[key] = entry
+
+    def invalidate(self, indicator_type: str, value: str) -> None:
+        key = (_intern_type(indicator_type), value)
+        with self._lock:
+            for store in (self._t1, self._t2, self._b1, self._b2):
+                store.pop(key, None)
+
+    def _replace(self, key: Key) -> None:
+        if self._t1 and (len(self._t1) > self._p or (key in self._b2 and len(self._t1) == self._p)):
+            old, _ = self._t1.popitem(last=False)
+            self._b1[old] = None
+        elif self._t2:
+            old, _ = self._t2.popitem(last=False)
+            self._b2[old] = None
+
+
+class KnownIndicatorFilter:
+    """Negative filter over (indicator_type, value) pairs known to the indicators table.
+
+    Most event-derived indicators never match anything; checking membership
+    here skips the SELECT entirely for them. Until load() runs the filter
+    answers True for everything so lookups stay correct.
+    """
+
+    def __init__(self, max_age_seconds: int = 60) -> None:
+        self.max_age = max_age_seconds
+        self._known: set[tuple[str, str]] | None = None
+        self._loaded_at = 0.0
+
+    def load(self, pairs: "list[tuple[str, str]]") -> None:
+        self._known = set(pairs)
+        self._loaded_at = time.monotonic()
+
+    def stale(self) -> bool:
+        return self._known is None or time.monotonic() - self._loaded_at >= self.max_age
+
+    def add(self, indicator_type: str, value: str) -> None:
+        if self._known is not None:
+            self._known.add((indicator_type, value))
+
+    def might_contain(self, indicator_type: str, value: str) -> bool:
+        return self._known is None or (indicator_type, value) in self._known
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 
 
 SEVERITY_SCORES = {
@@ -12,10 +14,20 @@ SEVERITY_SCORES = {
 
 
 def score_sighting(confidence: int, severity: str) -> int:
-    base = SEVERITY_SCORES.get(severity.lower(), 20)
-    confidence_factor = max(0, min(confidence, 100)) / 100
-    return int(base * confidence_factor)
+    # Severity is almost always already lowercase; only fall back to the
+    # allocating .lower() when the direct probe misses.
+    base = SEVERITY_SCORES.get(severity)
+    if base is None:
+        base = SEVERITY_SCORES.get(severity.lower(), 20)
+    return (base * max(0, min(confidence, 100))) // 100
+
+
+@lru_cache(maxsize=1)
+def _iso_for_second(second: int) -> str:
+    return datetime.fromtimestamp(second, timezone.utc).isoformat()
 
 
 def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    # Batched events overwhelmingly share the same wall-clock second, so
+    # the formatted string is reused instead of rebuilt per call.
+    return _iso_for_second(int(time.time()))
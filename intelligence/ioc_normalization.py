@@ -1,29 +1,49 @@
 from __future__ import annotations
 
 import ipaddress
-import json
 import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable
 from urllib.parse import urlparse
 
-IPV4_RE = re.compile(r"\b(?:(?:\d{1,3}\.){3}\d{1,3})\b")
-IPV6_RE = re.compile(r"\b(?:[0-9a-fA-F]{0,4}:){2,7}[0-9a-fA-F]{0,4}\b")
-EMAIL_RE = re.compile(r"\b[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}\b")
+# Quantifiers are possessive wherever the following literal cannot occur in
+# the preceding class (octet before dot, label before dot, local part before
+# @), so hostile runs of repeats fail without backtracking. The URL pattern
+# keeps its greedy tail: the trailing \b must be able to give back
+# punctuation.
+IPV4_RE = re.compile(r"\b(?:(?:\d{1,3}+\.){3}\d{1,3}+)\b")
+IPV6_RE = re.compile(r"\b(?:[0-9a-fA-F]{0,4}+:){2,7}[0-9a-fA-F]{0,4}\b")
+EMAIL_RE = re.compile(r"\b[a-zA-Z0-9._%+\-]++@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}\b")
 URL_RE = re.compile(r"\bhttps?://[^\s<>()]+\b")
 HASH_RE = re.compile(r"\b[a-fA-F0-9]{32}\b|\b[a-fA-F0-9]{40}\b|\b[a-fA-F0-9]{64}\b")
-DOMAIN_RE = re.compile(r"\b(?!https?://)([a-zA-Z0-9\-]+\.)+[a-zA-Z]{2,}\b")
+DOMAIN_RE = re.compile(r"\b(?!https?://)(?:[a-zA-Z0-9\-]++\.)+[a-zA-Z]{2,}\b")
 
+# One alternation, one pass over the text; finditer dispatches on lastgroup.
+# URL before domain so a URL consumes its own hostname; email before domain
+# for the same reason.
+MASTER_RE = re.compile(
+    r"(?P<url>\bhttps?://[^\s<>()]+\b)"
+    r"|(?P<email>\b[a-zA-Z0-9._%+\-]++@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}\b)"
+    r"|(?P<ip6>\b(?:[0-9a-fA-F]{0,4}+:){2,7}[0-9a-fA-F]{0,4}\b)"
+    r"|(?P<ip4>\b(?:(?:\d{1,3}+\.){3}\d{1,3}+)\b)"
+    r"|(?P<hash>\b[a-fA-F0-9]{32}\b|\b[a-fA-F0-9]{40}\b|\b[a-fA-F0-9]{64}\b)"
+    r"|(?P<domain>\b(?:[a-zA-Z0-9\-]++\.)+[a-zA-Z]{2,}\b)"
+)
 
+
+_NORMALIZERS: dict[str, Callable[[str], str]] = {
+    "domain": str.lower,
+    "email": str.lower,
+    "hash": str.lower,
+}
+
+
+@lru_cache(maxsize=65536)
 def normalize_indicator_value(indicator_type: str, value: str) -> str:
     cleaned = value.strip()
-    if indicator_type in {"domain", "email"}:
-        return cleaned.lower()
-    if indicator_type == "hash":
-        return cleaned.lower()
-    if indicator_type == "url":
-        return cleaned.strip()
-    if indicator_type == "ip":
-        return cleaned
-    return cleaned
+    normalizer = _NORMALIZERS.get(indicator_type)
+    return normalizer(cleaned) if normalizer else cleaned
 
 
 def _valid_ip(value: str) -> bool:
@@ -34,21 +54,79 @@ def _valid_ip(value: str) -> bool:
     return True
 
 
+@lru_cache(maxsize=4096)
 def guess_indicator_type(value: str) -> str | None:
-    if _valid_ip(value):
+    # Cheap character gates keep non-candidates out of ipaddress and the
+    # regex engine entirely; most fields fail every branch.
+    if not value:
+        return None
+    if (value[0].isdigit() or ":" in value) and _valid_ip(value):
         return "ip"
-    if EMAIL_RE.fullmatch(value):
+    if "@" in value and EMAIL_RE.fullmatch(value):
         return "email"
-    if URL_RE.fullmatch(value):
+    if value.startswith(("http://", "https://")) and URL_RE.fullmatch(value):
         return "url"
-    if HASH_RE.fullmatch(value):
+    if len(value) in (32, 40, 64) and HASH_RE.fullmatch(value):
         return "hash"
-    if DOMAIN_RE.fullmatch(value):
+    if "." in value and DOMAIN_RE.fullmatch(value):
         return "domain"
     return None
 
 
+_EVENT_KEY_FIELDS = (
+    "source",
+    "destination",
+    "source_ip",
+    "client_ip",
+    "resolved_ip",
+    "dns_query",
+    "dns_server",
+    "smtp_helo",
+    "smtp_mail_from",
+    "smtp_rcpt_to",
+    "url",
+    "attachment_hash",
+)
+_METADATA_KEY_FIELDS = (
+    "client_ip",
+    "destination_ip",
+    "dst_ip",
+    "domain",
+    "helo",
+    "sender",
+    "mail_from",
+    "recipient",
+    "rcpt_to",
+    "url",
+    "attachment_hash",
+)
+_NORMALIZED_FIELDS_CACHE: dict[tuple, dict] = {}
+_NORMALIZED_FIELDS_CACHE_MAX = 4096
+
+
 def normalize_event_fields(event: dict, metadata: dict) -> dict:
+    key = tuple(event.get(field) for field in _EVENT_KEY_FIELDS) + tuple(
+        metadata.get(field) for field in _METADATA_KEY_FIELDS
+    )
+    try:
+        cached = _NORMALIZED_FIELDS_CACHE.get(key)
+    except TypeError:
+        return _normalize_event_fields(event, metadata)
+    if cached is not None:
+        return dict(cached)
+    fields = _normalize_event_fields(event, metadata)
+    if len(_NORMALIZED_FIELDS_CACHE) >= _NORMALIZED_FIELDS_CACHE_MAX:
+        _NORMALIZED_FIELDS_CACHE.clear()
+    _NORMALIZED_FIELDS_CACHE[key] = fields
+    return dict(fields)
+
+
+def clear_caches() -> None:
+    normalize_indicator_value.cache_clear()
+    _NORMALIZED_FIELDS_CACHE.clear()
+
+
+def _normalize_event_fields(event: dict, metadata: dict) -> dict:
     source = event.get("source")
     destination = event.get("destination")
     fields = {
@@ -76,62 +154,99 @@ def normalize_event_fields(event: dict, metadata: dict) -> dict:
 
 
 def _extract_from_text(text: str) -> list[dict]:
+    if not text or ("." not in text and ":" not in text and "@" not in text and len(text) < 32):
+        return []
     indicators: list[dict] = []
-    for match in IPV4_RE.findall(text):
-        if _valid_ip(match):
-            indicators.append({"indicator_type": "ip", "value": normalize_indicator_value("ip", match)})
-    for match in IPV6_RE.findall(text):
-        if _valid_ip(match):
-            indicators.append({"indicator_type": "ip", "value": normalize_indicator_value("ip", match)})
-    for match in EMAIL_RE.findall(text):
-        indicators.append({"indicator_type": "email", "value": normalize_indicator_value("email", match)})
-    for match in URL_RE.findall(text):
-        indicators.append({"indicator_type": "url", "value": normalize_indicator_value("url", match)})
-        parsed = urlparse(match)
-        if parsed.hostname:
-            indicators.append({"indicator_type": "domain", "value": normalize_indicator_value("domain", parsed.hostname)})
-    for match in HASH_RE.findall(text):
-        indicators.append({"indicator_type": "hash", "value": normalize_indicator_value("hash", match)})
-    for match in DOMAIN_RE.findall(text):
-        indicators.append({"indicator_type": "domain", "value": normalize_indicator_value("domain", match)})
+    for match in MASTER_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+        # Regex matches carry no surrounding whitespace, so normalization
+        # is inlined here: lowercase for case-insensitive types, as-is
+        # for the rest.
+        if kind in ("ip4", "ip6"):
+            if _valid_ip(value):
+                indicators.append({"indicator_type": "ip", "value": value})
+        elif kind == "url":
+            indicators.append({"indicator_type": "url", "value": value})
+            parsed = urlparse(value)
+            if parsed.hostname:
+                indicators.append({"indicator_type": "domain", "value": parsed.hostname.lower()})
+        else:
+            indicators.append({"indicator_type": kind, "value": value.lower()})
     return indicators
 
 
-def extract_event_indicators(event: dict, metadata: dict) -> list[dict]:
-    indicators: list[dict] = []
+@dataclass(slots=True)
+class IndicatorBatch:
+    """Column-oriented view of extracted indicators.
+
+    One list per attribute instead of one dict per indicator; callers that
+    only need the values (set membership, cache keys) avoid per-element
+    dict access, and the columns are ready for vectorized batching.
+    """
+
+    types: list[str] = field(default_factory=list)
+    values: list[str] = field(default_factory=list)
+    matched_fields: list[str] = field(default_factory=list)
+    matched_values: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def append(self, indicator_type: str, value: str, matched_field: str, matched_value: str) -> None:
+        self.types.append(indicator_type)
+        self.values.append(value)
+        self.matched_fields.append(matched_field)
+        self.matched_values.append(matched_value)
+
+    def to_dicts(self) -> list[dict]:
+        return [
+            {
+                "indicator_type": indicator_type,
+                "value": value,
+                "matched_field": matched_field,
+                "matched_value": matched_value,
+            }
+            for indicator_type, value, matched_field, matched_value in zip(
+                self.types, self.values, self.matched_fields, self.matched_values
+            )
+        ]
+
+
+def extract_event_indicator_batch(event: dict, metadata: dict) -> IndicatorBatch:
+    batch = IndicatorBatch()
+    seen: set[tuple[str, str, str]] = set()
     normalized_fields = normalize_event_fields(event, metadata)
 
-    for field, value in normalized_fields.items():
+    for matched_field, value in normalized_fields.items():
         if not value:
             continue
         indicator_type = guess_indicator_type(str(value))
-        if indicator_type:
-            indicators.append(
-                {
-                    "indicator_type": indicator_type,
-                    "value": normalize_indicator_value(indicator_type, str(value)),
-                    "matched_field": field,
-                    "matched_value": str(value),
-                }
-            )
+        if not indicator_type:
+            continue
+        normalized = normalize_indicator_value(indicator_type, str(value))
+        key = (indicator_type, normalized, matched_field)
+        if key in seen:
+            continue
+        seen.add(key)
+        batch.append(indicator_type, normalized, matched_field, str(value))
 
     raw_text = event.get("raw", "")
     for indicator in _extract_from_text(raw_text):
-        indicator["matched_field"] = "raw"
-        indicator["matched_value"] = indicator["value"]
-        indicators.append(indicator)
+        key = (indicator["indicator_type"], indicator["value"], "raw")
+        if key in seen:
+            continue
+        seen.add(key)
+        batch.append(indicator["indicator_type"], indicator["value"], "raw", indicator["value"])
 
-    unique: dict[tuple[str, str, str], dict] = {}
-    for indicator in indicators:
-        key = (
-            indicator["indicator_type"],
-            indicator["value"],
-            indicator["matched_field"],
-        )
-        unique[key] = indicator
+    return batch
 
-    return list(unique.values())
+
+def extract_event_indicators(event: dict, metadata: dict) -> list[dict]:
+    return extract_event_indicator_batch(event, metadata).to_dicts()
 
 
 def serialize_indicators(indicators: list[dict]) -> list[dict]:
-    return json.loads(json.dumps(indicators))
+    # The elements are flat str->str dicts; shallow copies give the same
+    # isolation as the old JSON round-trip without the encode/decode cost.
+    return [dict(indicator) for indicator in indicators]
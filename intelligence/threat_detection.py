@@ -2,29 +2,80 @@ from __future__ import annotations
 
 import json
 import re
-from datetime import datetime, timezone
-from typing import Iterable
 
 import yaml
 
+from intelligence.ioc_matching import now_iso
 from intelligence.scoring import score_detection
 
 
 def load_rules(path: str) -> list[dict]:
     with open(path, "r", encoding="utf-8") as handle:
         data = yaml.safe_load(handle)
-    return data.get("rules", [])
+    rules = data.get("rules", [])
+    for rule in rules:
+        pattern = rule.get("pattern")
+        rule["_re"] = re.compile(pattern, re.IGNORECASE) if pattern else None
+    return rules
+
+
+# Joining patterns renumbers their capture groups, so a numbered
+# backreference or conditional group would silently point at another
+# rule's group in the combined form; such rules disable the prefilter.
+_GROUP_SENSITIVE_RE = re.compile(r"\\\d|\(\?\(")
+
+
+def _compile_raw_prefilter(rules: list[dict]) -> re.Pattern | None:
+    """Single alternation over every raw-field pattern, scanned once per event.
+
+    One pass answers "can any raw rule match at all"; only then do the
+    per-rule patterns run, keeping exact multi-match semantics. A true
+    multi-pattern engine (Hyperscan) would report rule ids directly but
+    is not worth a native dependency at this rule count.
+    """
+    patterns = [rule["pattern"] for rule in rules if rule.get("pattern") and rule.get("field", "raw") == "raw"]
+    if not patterns:
+        return None
+    if any(_GROUP_SENSITIVE_RE.search(pattern) for pattern in patterns):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    except re.error:
+        return None
+
+
+# Keyed by the identity of the rules list get_rules() keeps stable; holds a
+# strong reference to the list so the id cannot be recycled.
+_PREFILTER_CACHE: dict[int, tuple[list[dict], re.Pattern | None]] = {}
+
+
+def _raw_prefilter(rules: list[dict]) -> re.Pattern | None:
+    cached = _PREFILTER_CACHE.get(id(rules))
+    if cached is not None and cached[0] is rules:
+        return cached[1]
+    prefilter = _compile_raw_prefilter(rules)
+    if len(_PREFILTER_CACHE) >= 8:
+        _PREFILTER_CACHE.clear()
+    _PREFILTER_CACHE[id(rules)] = (rules, prefilter)
+    return prefilter
 
 
-def evaluate_event(event: dict, rules: Iterable[dict]) -> list[dict]:
+def evaluate_event(event: dict, rules: list[dict]) -> list[dict]:
     detections = []
     raw = event.get("raw", "")
     metadata = json.loads(event.get("metadata", "{}"))
+    prefilter = _raw_prefilter(rules) if isinstance(rules, list) else None
+    raw_can_match = prefilter.search(raw) is not None if prefilter else True
     for rule in rules:
         pattern = rule.get("pattern")
+        if not pattern:
+            continue
         field = rule.get("field", "raw")
+        if field == "raw" and not raw_can_match:
+            continue
+        compiled = rule.get("_re") or re.compile(pattern, re.IGNORECASE)
         target = raw if field == "raw" else metadata.get(field, "")
-        if pattern and re.search(pattern, str(target), re.IGNORECASE):
+        if compiled.search(str(target)):
             confidence, severity = score_detection(rule)
             detections.append(
                 {
@@ -33,7 +84,7 @@ def evaluate_event(event: dict, rules: Iterable[dict]) -> list[dict]:
                     "severity": severity,
                     "confidence": confidence,
                     "rule": rule.get("name", "rule"),
-                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "created_at": now_iso(),
                 }
             )
     return detections
@@ -3,9 +3,10 @@ from __future__ import annotations
 import json
 import os
 import smtplib
-from datetime import datetime, timezone
 from email.message import EmailMessage
 
+from intelligence.ioc_matching import now_iso
+
 
 def build_alert(detection: dict, event: dict) -> dict:
     title = f"{detection['detection_type']} detected"
@@ -14,7 +15,7 @@ def build_alert(detection: dict, event: dict) -> dict:
         "title": title,
         "severity": detection["severity"],
         "status": "open",
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": now_iso(),
         "details": json.dumps({"event": event, "detection": detection}),
     }
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from intelligence.ioc_matching import now_iso
 
 
 def decide_action(severity: str) -> dict:
@@ -8,10 +8,10 @@ def decide_action(severity: str) -> dict:
         return {
             "action": "log_and_alert",
             "reason": "Severity threshold reached",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
     return {
         "action": "log_only",
         "reason": "Below automation threshold",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": now_iso(),
     }
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import atexit
+import operator
 import sqlite3
+import threading
+from collections import ChainMap
+
+import orjson
+import zstandard
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 SCHEMA = [
     """
@@ -126,6 +135,12 @@ SCHEMA = [
     );
     """,
     """
+    CREATE TABLE IF NOT EXISTS stats (
+        name TEXT PRIMARY KEY,
+        n INTEGER NOT NULL
+    );
+    """,
+    """
     CREATE TABLE IF NOT EXISTS enrichment_cache (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         indicator TEXT NOT NULL,
@@ -171,6 +186,34 @@ INDICATOR_COLUMNS: dict[str, str] = {
 
 INCIDENT_COLUMNS: dict[str, str] = {"case_id": "INTEGER"}
 
+# Callers may hand JSON payload fields over as live dicts; they are encoded
+# once at bind time by the C-backed encoder instead of a stdlib json.dumps
+# in every caller.
+sqlite3.register_adapter(dict, lambda value: orjson.dumps(value).decode())
+sqlite3.register_adapter(list, lambda value: orjson.dumps(value).decode())
+
+# Large JSON payloads are stored zstd-compressed; a zstd frame is
+# recognizable by its own magic bytes, so legacy plain-text rows read back
+# unchanged. Values under the threshold aren't worth the frame overhead.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_COMPRESS_MIN_BYTES = 128
+_zstd_compressor = zstandard.ZstdCompressor(level=3)
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def compress_json(text: str | bytes | dict | list | None) -> object:
+    if isinstance(text, dict) or isinstance(text, list):
+        text = orjson.dumps(text).decode()
+    if text is None or not isinstance(text, str) or len(text) < _COMPRESS_MIN_BYTES:
+        return text
+    return _zstd_compressor.compress(text.encode())
+
+
+def decompress_json(value: str | bytes | None) -> str | None:
+    if isinstance(value, bytes) and value.startswith(_ZSTD_MAGIC):
+        return _zstd_decompressor.decompress(value).decode()
+    return value
+
 
 def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
     existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
@@ -179,6 +222,17 @@ def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str
             conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
 
 
+# Secondary indexes on events; dropped and rebuilt around bulk backfills.
+EVENT_INDEX_NAMES = (
+    "idx_events_source_ip",
+    "idx_events_destination",
+    "idx_events_dns_query",
+    "idx_events_url",
+    "idx_events_tenant",
+    "idx_events_asset",
+)
+
+
 def _ensure_indexes(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE INDEX IF NOT EXISTS idx_events_source_ip ON events(source_ip)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_events_destination ON events(destination)")
@@ -188,75 +242,304 @@ def _ensure_indexes(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE INDEX IF NOT EXISTS idx_events_asset ON events(asset_id)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_indicators_type_value ON indicators(indicator_type, value)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_sightings_indicator ON sightings(indicator_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_event_id ON detections(event_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_detection_id ON alerts(detection_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_created_at ON alerts(created_at DESC)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_incidents_key ON incidents(key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sightings_timestamp ON sightings(timestamp DESC)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_indicators_match"
+        " ON indicators(indicator_type, value, revoked, false_positive, expires_at)"
+    )
 
 
-def get_connection(db_path: str | Path) -> sqlite3.Connection:
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+]
+
+_local = threading.local()
+_all_connections: list[sqlite3.Connection] = []
+_all_connections_lock = threading.Lock()
+
+
+@atexit.register
+def _close_connections() -> None:
+    with _all_connections_lock:
+        for conn in _all_connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _all_connections.clear()
+
+
+def close_thread_connections() -> None:
+    """Close and unregister the calling thread's cached connections.
+
+    Short-lived worker threads (ingest-socket handlers) must call this on
+    exit: the thread-local cache dies with the thread, but the global
+    registry would otherwise keep each connection and its file descriptor
+    alive forever.
+    """
+    cached: dict[str, sqlite3.Connection] = getattr(_local, "connections", None) or {}
+    if not cached:
+        return
+    _local.connections = {}
+    with _all_connections_lock:
+        for conn in cached.values():
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            try:
+                _all_connections.remove(conn)
+            except ValueError:
+                pass
+
+
+def _connect(path: Path, readonly: bool) -> sqlite3.Connection:
+    # isolation_level=None keeps sqlite3 out of autocommit management;
+    # transactions are opened explicitly via transaction().
+    if readonly:
+        conn = sqlite3.connect(
+            f"file:{path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+    else:
+        conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+    conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _cached_connection(db_path: str | Path, readonly: bool) -> sqlite3.Connection:
     path = Path(db_path)
+    key = ("ro:" if readonly else "rw:") + str(path)
+    cached: dict[str, sqlite3.Connection] = getattr(_local, "connections", None) or {}
+    conn = cached.get(key)
+    if conn is not None:
+        return conn
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
+    conn = _connect(path, readonly)
+    cached[key] = conn
+    _local.connections = cached
+    with _all_connections_lock:
+        _all_connections.append(conn)
     return conn
 
 
+def get_connection(db_path: str | Path) -> sqlite3.Connection:
+    return _cached_connection(db_path, readonly=False)
+
+
+def get_read_connection(db_path: str | Path) -> sqlite3.Connection:
+    """Read-only connection for query endpoints; cannot take the write lock.
+
+    Falls back to the writable connection when the database file does not
+    exist yet (mode=ro cannot create it).
+    """
+    try:
+        return _cached_connection(db_path, readonly=True)
+    except sqlite3.OperationalError:
+        return get_connection(db_path)
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Group writes into one durable commit; rolls back on any exception."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+@contextmanager
+def bulk_ingest_mode(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Drop the events secondary indexes for a historical backfill.
+
+    Index maintenance dominates bulk inserts; building each index once at
+    the end is a single linear sort instead. Reads that depend on the
+    events indexes must not run while the block is open.
+    """
+    for name in EVENT_INDEX_NAMES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    try:
+        yield conn
+    finally:
+        _ensure_indexes(conn)
+        conn.commit()
+
+
+# Bump when SCHEMA/columns/indexes change so warm databases skip the
+# table_info probes and ALTER attempts entirely.
+SCHEMA_VERSION = 2
+
+
+def _ensure_fts(conn: sqlite3.Connection, from_version: int) -> None:
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+            raw, email_subject, dns_query,
+            content='events', content_rowid='id', tokenize='trigram'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+            INSERT INTO events_fts(rowid, raw, email_subject, dns_query)
+            VALUES (new.id, new.raw, new.email_subject, new.dns_query);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+            INSERT INTO events_fts(events_fts, rowid, raw, email_subject, dns_query)
+            VALUES ('delete', old.id, old.raw, old.email_subject, old.dns_query);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_fts_au
+        AFTER UPDATE OF raw, email_subject, dns_query ON events BEGIN
+            INSERT INTO events_fts(events_fts, rowid, raw, email_subject, dns_query)
+            VALUES ('delete', old.id, old.raw, old.email_subject, old.dns_query);
+            INSERT INTO events_fts(rowid, raw, email_subject, dns_query)
+            VALUES (new.id, new.raw, new.email_subject, new.dns_query);
+        END
+        """
+    )
+    if from_version < 2:
+        conn.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+    if version == SCHEMA_VERSION:
+        # Indexes may have been dropped by a bulk_ingest_mode run that died
+        # before its rebuild; IF NOT EXISTS makes this a cheap catalog check.
+        _ensure_indexes(conn)
+        return
     for statement in SCHEMA:
         conn.execute(statement)
     _ensure_columns(conn, "events", EVENT_COLUMNS)
     _ensure_columns(conn, "indicators", INDICATOR_COLUMNS)
     _ensure_columns(conn, "incidents", INCIDENT_COLUMNS)
     _ensure_indexes(conn)
+    _ensure_fts(conn, version)
+    _seed_stats(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
 
 
-def insert_event(conn: sqlite3.Connection, event: dict) -> int:
-    cursor = conn.execute(
-        """
-        INSERT INTO events (
-            source, event_time, source_ip, destination,
-            smtp_mail_from, smtp_rcpt_to, smtp_helo, smtp_status,
-            email_subject, email_message_id, email_client_ip,
-            attachment_hash, url,
-            dns_query, dns_qtype, dns_rcode, dns_server,
-            client_ip, resolved_ip,
-            host_name, sensor_id, tenant_id, asset_id, asset_criticality, user_name,
-            metadata, raw
+_BUMP_STAT_SQL = "INSERT INTO stats (name, n) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET n = n + excluded.n"
+
+# Row counters maintained on insert so the dashboard never scans the big
+# tables; incidents and cases stay on COUNT(*) since their cardinality is
+# bounded by distinct incident keys.
+_COUNTED_TABLES = ("events", "detections", "alerts")
+
+
+def _seed_stats(conn: sqlite3.Connection) -> None:
+    for table in _COUNTED_TABLES:
+        # An aggregate SELECT always yields a row, so gate duplicates with
+        # ON CONFLICT rather than a WHERE NOT EXISTS that cannot suppress it.
+        conn.execute(
+            f"INSERT INTO stats (name, n) SELECT ?, COUNT(*) FROM {table} WHERE true "
+            "ON CONFLICT(name) DO NOTHING",
+            (table,),
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            event["source"],
-            event["event_time"],
-            event.get("source_ip"),
-            event.get("destination"),
-            event.get("smtp_mail_from"),
-            event.get("smtp_rcpt_to"),
-            event.get("smtp_helo"),
-            event.get("smtp_status"),
-            event.get("email_subject"),
-            event.get("email_message_id"),
-            event.get("email_client_ip"),
-            event.get("attachment_hash"),
-            event.get("url"),
-            event.get("dns_query"),
-            event.get("dns_qtype"),
-            event.get("dns_rcode"),
-            event.get("dns_server"),
-            event.get("client_ip"),
-            event.get("resolved_ip"),
-            event.get("host_name"),
-            event.get("sensor_id"),
-            event.get("tenant_id"),
-            event.get("asset_id"),
-            event.get("asset_criticality"),
-            event.get("user_name"),
-            event.get("metadata", "{}"),
-            event["raw"],
-        ),
+
+
+def _bump_stat(conn: sqlite3.Connection, name: str, delta: int = 1) -> None:
+    if delta:
+        conn.execute(_BUMP_STAT_SQL, (name, delta))
+
+
+_EVENT_COLUMN_COUNT = 27
+_EVENT_ROW_PLACEHOLDER = "(" + ", ".join("?" * _EVENT_COLUMN_COUNT) + ")"
+_INSERT_EVENTS_PREFIX = """
+    INSERT INTO events (
+        source, event_time, source_ip, destination,
+        smtp_mail_from, smtp_rcpt_to, smtp_helo, smtp_status,
+        email_subject, email_message_id, email_client_ip,
+        attachment_hash, url,
+        dns_query, dns_qtype, dns_rcode, dns_server,
+        client_ip, resolved_ip,
+        host_name, sensor_id, tenant_id, asset_id, asset_criticality, user_name,
+        metadata, raw
     )
-    conn.commit()
+    VALUES """
+INSERT_EVENT_SQL = _INSERT_EVENTS_PREFIX + _EVENT_ROW_PLACEHOLDER
+
+# Rows per multi-VALUES statement; 36 * 27 = 972 bound parameters stays
+# under SQLite's conservative 999 default.
+_EVENT_CHUNK_ROWS = 36
+
+
+EVENT_FIELD_ORDER = (
+    "source", "event_time", "source_ip", "destination",
+    "smtp_mail_from", "smtp_rcpt_to", "smtp_helo", "smtp_status",
+    "email_subject", "email_message_id", "email_client_ip",
+    "attachment_hash", "url",
+    "dns_query", "dns_qtype", "dns_rcode", "dns_server",
+    "client_ip", "resolved_ip",
+    "host_name", "sensor_id", "tenant_id", "asset_id", "asset_criticality", "user_name",
+    "metadata", "raw",
+)
+_EVENT_DEFAULTS = dict.fromkeys(EVENT_FIELD_ORDER)
+_EVENT_DEFAULTS["metadata"] = "{}"
+# One C-level itemgetter call replaces 27 dict.get dispatches per row.
+_EVENT_GETTER = operator.itemgetter(*EVENT_FIELD_ORDER)
+_EVENT_METADATA_INDEX = EVENT_FIELD_ORDER.index("metadata")
+
+
+def _event_row(event: dict) -> list:
+    row = list(_EVENT_GETTER(ChainMap(event, _EVENT_DEFAULTS)))
+    row[_EVENT_METADATA_INDEX] = compress_json(row[_EVENT_METADATA_INDEX])
+    return row
+
+
+def insert_event(conn: sqlite3.Connection, event: dict) -> int:
+    cursor = conn.execute(INSERT_EVENT_SQL, _event_row(event))
+    _bump_stat(conn, "events")
     return int(cursor.lastrowid)
 
 
+def insert_events_many(conn: sqlite3.Connection, events: list[dict]) -> list[int]:
+    if not events:
+        return []
+    ids: list[int] = []
+    for start in range(0, len(events), _EVENT_CHUNK_ROWS):
+        chunk = events[start : start + _EVENT_CHUNK_ROWS]
+        sql = _INSERT_EVENTS_PREFIX + ",".join([_EVENT_ROW_PLACEHOLDER] * len(chunk))
+        params: list = []
+        for event in chunk:
+            params.extend(_event_row(event))
+        conn.execute(sql, params)
+        ids.extend(_backfill_ids(conn, len(chunk)))
+    _bump_stat(conn, "events", len(events))
+    return ids
+
+
 def update_event_metadata(conn: sqlite3.Connection, event_id: int, metadata: str) -> None:
     conn.execute(
         """
@@ -264,9 +547,8 @@ def update_event_metadata(conn: sqlite3.Connection, event_id: int, metadata: str
         SET metadata = ?
         WHERE id = ?
         """,
-        (metadata, event_id),
+        (compress_json(metadata), event_id),
     )
-    conn.commit()
 
 
 def insert_detection(conn: sqlite3.Connection, detection: dict) -> int:
@@ -284,7 +566,7 @@ def insert_detection(conn: sqlite3.Connection, detection: dict) -> int:
             detection["created_at"],
         ),
     )
-    conn.commit()
+    _bump_stat(conn, "detections")
     return int(cursor.lastrowid)
 
 
@@ -303,31 +585,27 @@ def insert_alert(conn: sqlite3.Connection, alert: dict) -> int:
             alert["details"],
         ),
     )
-    conn.commit()
+    _bump_stat(conn, "alerts")
     return int(cursor.lastrowid)
 
 
 def update_incident(conn: sqlite3.Connection, key: str, severity: str, timestamp: str) -> None:
-    existing = conn.execute("SELECT * FROM incidents WHERE key = ?", (key,)).fetchone()
     case_id = _ensure_case_for_incident(conn, key, severity, timestamp)
-    if existing:
-        conn.execute(
-            """
-            UPDATE incidents
-            SET count = count + 1, last_seen = ?, severity = ?, case_id = ?
-            WHERE key = ?
-            """,
-            (timestamp, severity, case_id, key),
-        )
-    else:
-        conn.execute(
-            """
-            INSERT INTO incidents (key, severity, count, first_seen, last_seen, case_id)
-            VALUES (?, ?, 1, ?, ?, ?)
-            """,
-            (key, severity, timestamp, timestamp, case_id),
-        )
-    conn.commit()
+    conn.execute(
+        """
+        INSERT INTO incidents (key, severity, count, first_seen, last_seen, case_id)
+        VALUES (?, ?, 1, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            count = count + 1,
+            last_seen = excluded.last_seen,
+            severity = excluded.severity,
+            case_id = excluded.case_id
+        """,
+        (key, severity, timestamp, timestamp, case_id),
+    )
+
+
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
 
 
 def _ensure_case_for_incident(
@@ -335,7 +613,28 @@ def _ensure_case_for_incident(
 ) -> int | None:
     if severity.lower() not in {"high", "critical"}:
         return None
-    existing = conn.execute("SELECT * FROM cases WHERE incident_key = ?", (incident_key,)).fetchone()
+    if _SUPPORTS_RETURNING:
+        row = conn.execute(
+            """
+            INSERT INTO cases (incident_key, title, status, owner, severity, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(incident_key) DO UPDATE SET
+                updated_at = excluded.updated_at,
+                severity = excluded.severity
+            RETURNING id
+            """,
+            (
+                incident_key,
+                f"Incident {incident_key}",
+                "open",
+                None,
+                severity,
+                timestamp,
+                timestamp,
+            ),
+        ).fetchone()
+        return int(row["id"])
+    existing = conn.execute("SELECT id FROM cases WHERE incident_key = ?", (incident_key,)).fetchone()
     if existing:
         conn.execute(
             """
@@ -364,48 +663,55 @@ def _ensure_case_for_incident(
     return int(cursor.lastrowid)
 
 
-def upsert_indicator(conn: sqlite3.Connection, indicator: dict) -> int:
-    cursor = conn.execute(
-        """
-        INSERT INTO indicators (
-            indicator_type, value, source, confidence, severity,
-            tlp, kill_chain_phase, revoked, false_positive,
-            first_seen, last_seen, expires_at, tags, relationships, raw_payload
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(indicator_type, value, source)
-        DO UPDATE SET
-            confidence = excluded.confidence,
-            severity = excluded.severity,
-            tlp = excluded.tlp,
-            kill_chain_phase = excluded.kill_chain_phase,
-            revoked = excluded.revoked,
-            false_positive = excluded.false_positive,
-            last_seen = excluded.last_seen,
-            expires_at = excluded.expires_at,
-            tags = excluded.tags,
-            relationships = excluded.relationships,
-            raw_payload = excluded.raw_payload
-        """,
-        (
-            indicator["indicator_type"],
-            indicator["value"],
-            indicator["source"],
-            indicator["confidence"],
-            indicator["severity"],
-            indicator.get("tlp"),
-            indicator.get("kill_chain_phase"),
-            indicator.get("revoked", 0),
-            indicator.get("false_positive", 0),
-            indicator["first_seen"],
-            indicator["last_seen"],
-            indicator.get("expires_at"),
-            indicator.get("tags"),
-            indicator.get("relationships"),
-            indicator.get("raw_payload"),
-        ),
+UPSERT_INDICATOR_SQL = """
+    INSERT INTO indicators (
+        indicator_type, value, source, confidence, severity,
+        tlp, kill_chain_phase, revoked, false_positive,
+        first_seen, last_seen, expires_at, tags, relationships, raw_payload
     )
-    conn.commit()
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(indicator_type, value, source)
+    DO UPDATE SET
+        confidence = excluded.confidence,
+        severity = excluded.severity,
+        tlp = excluded.tlp,
+        kill_chain_phase = excluded.kill_chain_phase,
+        revoked = excluded.revoked,
+        false_positive = excluded.false_positive,
+        last_seen = excluded.last_seen,
+        expires_at = excluded.expires_at,
+        tags = excluded.tags,
+        relationships = excluded.relationships,
+        raw_payload = excluded.raw_payload
+"""
+
+
+INDICATOR_FIELD_ORDER = (
+    "indicator_type", "value", "source", "confidence", "severity",
+    "tlp", "kill_chain_phase", "revoked", "false_positive",
+    "first_seen", "last_seen", "expires_at", "tags", "relationships", "raw_payload",
+)
+_INDICATOR_DEFAULTS = dict.fromkeys(INDICATOR_FIELD_ORDER)
+_INDICATOR_DEFAULTS["revoked"] = 0
+_INDICATOR_DEFAULTS["false_positive"] = 0
+_INDICATOR_GETTER = operator.itemgetter(*INDICATOR_FIELD_ORDER)
+_INDICATOR_COMPRESSED_INDEXES = tuple(
+    INDICATOR_FIELD_ORDER.index(name) for name in ("tags", "relationships", "raw_payload")
+)
+
+
+def _indicator_row(indicator: dict) -> list:
+    row = list(_INDICATOR_GETTER(ChainMap(indicator, _INDICATOR_DEFAULTS)))
+    for index in _INDICATOR_COMPRESSED_INDEXES:
+        row[index] = compress_json(row[index])
+    return row
+
+
+def upsert_indicator(conn: sqlite3.Connection, indicator: dict) -> int:
+    if _SUPPORTS_RETURNING:
+        row = conn.execute(UPSERT_INDICATOR_SQL + " RETURNING id", _indicator_row(indicator)).fetchone()
+        return int(row["id"])
+    cursor = conn.execute(UPSERT_INDICATOR_SQL, _indicator_row(indicator))
     if cursor.lastrowid:
         return int(cursor.lastrowid)
     row = conn.execute(
@@ -418,6 +724,14 @@ def upsert_indicator(conn: sqlite3.Connection, indicator: dict) -> int:
     return int(row["id"]) if row else 0
 
 
+# The match path only needs scoring fields; naming them keeps the large
+# tags/relationships/raw_payload blobs from crossing the C boundary per row.
+INDICATOR_MATCH_COLUMNS = "id, indicator_type, value, source, confidence, severity, expires_at"
+_INDICATOR_MATCH_COLUMNS_PREFIXED = ", ".join(
+    f"indicators.{name}" for name in INDICATOR_MATCH_COLUMNS.split(", ")
+)
+
+
 def fetch_indicator_matches(
     conn: sqlite3.Connection,
     indicator_type: str,
@@ -425,8 +739,8 @@ def fetch_indicator_matches(
     now: str,
 ) -> Iterable[sqlite3.Row]:
     return conn.execute(
-        """
-        SELECT *
+        f"""
+        SELECT {INDICATOR_MATCH_COLUMNS}
         FROM indicators
         WHERE indicator_type = ?
           AND value = ?
@@ -438,25 +752,142 @@ def fetch_indicator_matches(
     ).fetchall()
 
 
-def insert_sighting(conn: sqlite3.Connection, sighting: dict) -> int | None:
-    cursor = conn.execute(
+def fetch_indicator_full(conn: sqlite3.Connection, indicator_id: int) -> dict | None:
+    row = conn.execute("SELECT * FROM indicators WHERE id = ?", (indicator_id,)).fetchone()
+    if row is None:
+        return None
+    full = dict(row)
+    for name in ("tags", "relationships", "raw_payload"):
+        full[name] = decompress_json(full[name])
+    return full
+
+
+def _backfill_ids(conn: sqlite3.Connection, count: int) -> list[int]:
+    # Rowids assigned by one executemany inside a transaction are contiguous.
+    last_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+    return list(range(last_id - count + 1, last_id + 1))
+
+
+def insert_detections_many(conn: sqlite3.Connection, detections: list[dict]) -> list[int]:
+    if not detections:
+        return []
+    conn.executemany(
         """
-        INSERT OR IGNORE INTO sightings (
-            indicator_id, event_id, matched_field, matched_value, timestamp, context, score_delta
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO detections (event_id, detection_type, severity, confidence, rule, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
         """,
-        (
-            sighting["indicator_id"],
-            sighting["event_id"],
-            sighting["matched_field"],
-            sighting["matched_value"],
-            sighting["timestamp"],
-            sighting.get("context"),
-            sighting["score_delta"],
-        ),
+        [
+            (
+                detection["event_id"],
+                detection["detection_type"],
+                detection["severity"],
+                detection["confidence"],
+                detection["rule"],
+                detection["created_at"],
+            )
+            for detection in detections
+        ],
     )
-    conn.commit()
+    _bump_stat(conn, "detections", len(detections))
+    return _backfill_ids(conn, len(detections))
+
+
+def insert_alerts_many(conn: sqlite3.Connection, alerts: list[dict]) -> list[int]:
+    if not alerts:
+        return []
+    conn.executemany(
+        """
+        INSERT INTO alerts (detection_id, title, severity, status, created_at, details)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                alert["detection_id"],
+                alert["title"],
+                alert["severity"],
+                alert["status"],
+                alert["created_at"],
+                alert["details"],
+            )
+            for alert in alerts
+        ],
+    )
+    _bump_stat(conn, "alerts", len(alerts))
+    return _backfill_ids(conn, len(alerts))
+
+
+def insert_sightings_many(conn: sqlite3.Connection, sightings: list[dict]) -> int:
+    if not sightings:
+        return 0
+    cursor = conn.executemany(INSERT_SIGHTING_SQL, [_sighting_row(sighting) for sighting in sightings])
+    return int(cursor.rowcount)
+
+
+def fetch_indicator_keys(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    rows = conn.execute("SELECT indicator_type, value FROM indicators").fetchall()
+    return [(row["indicator_type"], row["value"]) for row in rows]
+
+
+INSERT_SIGHTING_SQL = """
+    INSERT OR IGNORE INTO sightings (
+        indicator_id, event_id, matched_field, matched_value, timestamp, context, score_delta
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _sighting_row(sighting: dict) -> tuple:
+    return (
+        sighting["indicator_id"],
+        sighting["event_id"],
+        sighting["matched_field"],
+        sighting["matched_value"],
+        sighting["timestamp"],
+        sighting.get("context"),
+        sighting["score_delta"],
+    )
+
+
+def fetch_indicator_matches_many(
+    conn: sqlite3.Connection,
+    pairs: list[tuple[str, str]],
+    now: str,
+) -> Iterable[sqlite3.Row]:
+    """One probe query for many (indicator_type, value) pairs.
+
+    Chunked to stay well inside SQLite's bound-parameter limit.
+    """
+    rows: list[sqlite3.Row] = []
+    for start in range(0, len(pairs), 100):
+        chunk = pairs[start : start + 100]
+        placeholders = ",".join("(?, ?)" for _ in chunk)
+        params: list[str] = []
+        for indicator_type, value in chunk:
+            params.append(indicator_type)
+            params.append(value)
+        params.append(now)
+        rows.extend(
+            conn.execute(
+                f"""
+                WITH probes(t, v) AS (VALUES {placeholders})
+                SELECT {_INDICATOR_MATCH_COLUMNS_PREFIXED}
+                FROM indicators
+                JOIN probes ON indicators.indicator_type = probes.t AND indicators.value = probes.v
+                WHERE indicators.revoked = 0
+                  AND indicators.false_positive = 0
+                  AND (indicators.expires_at IS NULL OR indicators.expires_at > ?)
+                """,
+                params,
+            ).fetchall()
+        )
+    return rows
+
+
+def insert_sighting(conn: sqlite3.Connection, sighting: dict) -> int | None:
+    if _SUPPORTS_RETURNING:
+        row = conn.execute(INSERT_SIGHTING_SQL + " RETURNING id", _sighting_row(sighting)).fetchone()
+        return int(row["id"]) if row else None
+    cursor = conn.execute(INSERT_SIGHTING_SQL, _sighting_row(sighting))
     if cursor.rowcount == 0:
         return None
     return int(cursor.lastrowid)
@@ -475,10 +906,54 @@ def fetch_sightings(conn: sqlite3.Connection, limit: int = 50) -> Iterable[sqlit
     ).fetchall()
 
 
+_ENRICHMENT_LOOKUP_CACHE: OrderedDict[tuple[str, str], sqlite3.Row] = OrderedDict()
+_ENRICHMENT_LOOKUP_CACHE_MAX = 65536
+
+
+def purge_events_before(conn: sqlite3.Connection, cutoff: str) -> int:
+    """Delete events older than cutoff along with their dependent rows.
+
+    Bounds table and index growth per config/database.yaml retention_days.
+    Run inside transaction(); the FTS delete trigger keeps events_fts in
+    step and the dashboard counters are decremented to match.
+    """
+    alerts = conn.execute(
+        """
+        DELETE FROM alerts WHERE detection_id IN (
+            SELECT detections.id FROM detections
+            JOIN events ON detections.event_id = events.id
+            WHERE events.event_time < ?
+        )
+        """,
+        (cutoff,),
+    ).rowcount
+    conn.execute(
+        "DELETE FROM sightings WHERE event_id IN (SELECT id FROM events WHERE event_time < ?)",
+        (cutoff,),
+    )
+    detections = conn.execute(
+        "DELETE FROM detections WHERE event_id IN (SELECT id FROM events WHERE event_time < ?)",
+        (cutoff,),
+    ).rowcount
+    events = conn.execute("DELETE FROM events WHERE event_time < ?", (cutoff,)).rowcount
+    _bump_stat(conn, "alerts", -alerts)
+    _bump_stat(conn, "detections", -detections)
+    _bump_stat(conn, "events", -events)
+    return int(events)
+
+
 def fetch_enrichment_cache(
     conn: sqlite3.Connection, indicator: str, indicator_type: str, now: str
 ) -> sqlite3.Row | None:
-    return conn.execute(
+    key = (indicator, indicator_type)
+    cached = _ENRICHMENT_LOOKUP_CACHE.get(key)
+    if cached is not None:
+        expires_at = cached["expires_at"]
+        if expires_at is None or expires_at > now:
+            _ENRICHMENT_LOOKUP_CACHE.move_to_end(key)
+            return cached
+        _ENRICHMENT_LOOKUP_CACHE.pop(key, None)
+    row = conn.execute(
         """
         SELECT * FROM enrichment_cache
         WHERE indicator = ? AND indicator_type = ?
@@ -486,9 +961,15 @@ def fetch_enrichment_cache(
         """,
         (indicator, indicator_type, now),
     ).fetchone()
+    if row is not None:
+        if len(_ENRICHMENT_LOOKUP_CACHE) >= _ENRICHMENT_LOOKUP_CACHE_MAX:
+            _ENRICHMENT_LOOKUP_CACHE.popitem(last=False)
+        _ENRICHMENT_LOOKUP_CACHE[key] = row
+    return row
 
 
 def upsert_enrichment_cache(conn: sqlite3.Connection, entry: dict) -> int:
+    _ENRICHMENT_LOOKUP_CACHE.pop((entry["indicator"], entry["indicator_type"]), None)
     cursor = conn.execute(
         """
         INSERT INTO enrichment_cache (indicator, indicator_type, value, updated_at, expires_at)
@@ -502,10 +983,26 @@ def upsert_enrichment_cache(conn: sqlite3.Connection, entry: dict) -> int:
             entry.get("expires_at"),
         ),
     )
-    conn.commit()
     return int(cursor.lastrowid)
 
 
+def search_events(conn: sqlite3.Connection, query: str, limit: int = 50) -> Iterable[sqlite3.Row]:
+    # Quote the query as an FTS5 phrase so operator characters in user
+    # input (dots in domains, @ in addresses) are matched literally.
+    phrase = '"' + query.replace('"', '""') + '"'
+    return conn.execute(
+        """
+        SELECT events.*
+        FROM events
+        JOIN events_fts ON events.id = events_fts.rowid
+        WHERE events_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+        """,
+        (phrase, limit),
+    ).fetchall()
+
+
 def fetch_alerts(conn: sqlite3.Connection, limit: int = 50) -> Iterable[sqlite3.Row]:
     return conn.execute(
         """
@@ -520,15 +1017,33 @@ def fetch_alerts(conn: sqlite3.Connection, limit: int = 50) -> Iterable[sqlite3.
     ).fetchall()
 
 
+DASHBOARD_STAT_KEYS = ("alert_count", "detection_count", "event_count", "incident_count", "case_count")
+
+
+def read_event_raw(conn: sqlite3.Connection, event_id: int, offset: int = 0, length: int = 4096) -> str | None:
+    """Read a slice of an event's raw payload.
+
+    substr() slices inside the SQLite VM, so only the requested window is
+    copied into Python - multi-KB payloads never materialize for previews.
+    """
+    row = conn.execute(
+        "SELECT substr(raw, ?, ?) FROM events WHERE id = ?",
+        (offset + 1, length, event_id),
+    ).fetchone()
+    return row[0] if row else None
+
+
 def fetch_dashboard_stats(conn: sqlite3.Connection) -> dict:
-    counts = conn.execute(
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    counts = cursor.execute(
         """
         SELECT
-            (SELECT COUNT(*) FROM alerts) AS alert_count,
-            (SELECT COUNT(*) FROM detections) AS detection_count,
-            (SELECT COUNT(*) FROM events) AS event_count,
-            (SELECT COUNT(*) FROM incidents) AS incident_count,
-            (SELECT COUNT(*) FROM cases) AS case_count
+            COALESCE((SELECT n FROM stats WHERE name = 'alerts'), 0),
+            COALESCE((SELECT n FROM stats WHERE name = 'detections'), 0),
+            COALESCE((SELECT n FROM stats WHERE name = 'events'), 0),
+            (SELECT COUNT(*) FROM incidents),
+            (SELECT COUNT(*) FROM cases)
         """
     ).fetchone()
-    return dict(counts)
+    return dict(zip(DASHBOARD_STAT_KEYS, counts))